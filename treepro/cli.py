@@ -1,6 +1,10 @@
 import click
-import questionary
+import io
 import os
+import stat
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from .tree import (
     get_all_items,
     gather_selected_files,
@@ -10,6 +14,66 @@ from .tree import (
 )
 
 
+def _native_newlines(data):
+    if os.linesep != "\n":
+        return data.replace(b"\n", os.linesep.encode("ascii"))
+    return data
+
+
+def _read_file(path):
+    """Read a selected file as raw bytes, returning (data, error)."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        # Only UTF-8 text is copied; binaries still get the "Error reading" line
+        data.decode("utf-8")
+        # Same newline handling as reading and writing in text mode
+        if b"\r" in data:
+            data = data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+        return _native_newlines(data), None
+    except Exception as e:
+        return None, e
+
+
+def _output_mode(path):
+    # mkstemp creates files as 0600: keep an existing file's permissions,
+    # otherwise use what a plain open() would have created
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+# At most this many selected files are read ahead of the one being written
+_READ_AHEAD = 8
+
+
+def _read_files(paths):
+    """Yield _read_file results in order, reading a bounded window ahead in threads."""
+    pool = ThreadPoolExecutor(max_workers=_READ_AHEAD)
+    remaining = iter(paths)
+    pending = deque()
+    try:
+        for path in remaining:
+            pending.append(pool.submit(_read_file, path))
+            if len(pending) == _READ_AHEAD:
+                break
+        while pending:
+            result = pending.popleft().result()
+            # Keep the window full while the caller writes this result
+            path = next(remaining, None)
+            if path is not None:
+                pending.append(pool.submit(_read_file, path))
+            yield result
+    finally:
+        # On early exit (error, Ctrl-C) don't wait for reads nobody will use
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=False)
+
+
 @click.command()
 @click.argument(
     "directory",
@@ -50,71 +114,118 @@ def treepro(directory, output, file_flag):
         project_dir = directory
         output_file = None
 
-    output_lines = []
+    buf = io.StringIO()
+    echoed = 0
 
     def echo_and_capture(msg=""):
-        click.echo(msg)
-        output_lines.append(msg)
+        buf.write(msg)
+        buf.write("\n")
+
+    def flush_output():
+        # Emit everything captured since the last flush in a single write
+        nonlocal echoed
+        text = buf.getvalue()[echoed:]
+        if text:
+            click.echo(text, nl=False)
+            echoed += len(text)
+
+    # Directory listings shared by both walks of the project below
+    listings = {}
 
     # 2) project structure
     if output == "json":
-        project_text = get_full_project_tree_json(project_dir)
+        project_text = get_full_project_tree_json(project_dir, listings)
     elif output == "yaml":
-        project_text = get_full_project_tree_yaml(project_dir)
+        project_text = get_full_project_tree_yaml(project_dir, listings)
     else:
-        project_text = get_full_project_tree_text(project_dir)
+        project_text = get_full_project_tree_text(project_dir, listings)
 
     echo_and_capture("PROJECT STRUCTURE :")
     echo_and_capture(project_text)
 
     # 3) interactive selection
-    items = get_all_items(project_dir)
+    items = get_all_items(project_dir, listings)
     if not items:
         echo_and_capture("No files found (or all files are ignored).")
+        flush_output()
         return
 
+    import questionary  # Deferred: pulls in prompt_toolkit, only needed here
+
     choices = []
-    for num in sorted(items.keys()):
-        item = items[num]
+    for num, item in sorted(items.items()):  # Item numbers are unique keys
         indent = "    " * item["depth"]
         name = os.path.basename(item["path"])
         title = f"{num}: {indent}{name}" + ("/" if item["is_dir"] else "")
         choices.append(questionary.Choice(title=title, value=num))
 
+    flush_output()  # The project structure must be visible before the prompt
     selected = questionary.checkbox(
         "Select items (use space to toggle):",
         choices=choices
     ).ask()
     if not selected:
         echo_and_capture("No items selected.")
+        flush_output()
         return
 
-    selected_files = gather_selected_files(items, selected)
+    selected_files = sorted(gather_selected_files(items, selected))
+
+    # Every collected path is os.path.join(project_dir, ...), so the relative
+    # path is a plain slice; relpath is only the fallback.
+    root_prefix = os.path.join(project_dir, "")
+
+    def rel_to_project(p):
+        if p.startswith(root_prefix):
+            return p[len(root_prefix):]
+        return os.path.relpath(p, project_dir)
+
     echo_and_capture("\nSELECTED FILES:")
-    for p in sorted(selected_files):
-        echo_and_capture(f"- {os.path.relpath(p, project_dir)}")
-
-    # 4) content of the selected files
-    parts = []
-    for p in sorted(selected_files):
-        rel = os.path.relpath(p, project_dir)
-        parts.append(f"\n--- {rel} ---\n")
-        try:
-            with open(p, "r", encoding="utf-8") as f:
-                parts.append(f.read())
-        except Exception as e:
-            parts.append(f"Error reading {rel}: {e}")
+    for p in selected_files:
+        echo_and_capture(f"- {rel_to_project(p)}")
 
-    content = "\n".join(parts)
+    flush_output()
 
-    # 5) saving to file (if requested)
+    # 4) + 5) saving to file (if requested): the captured output is encoded
+    #    once, then the selected files are read a few at a time in parallel and
+    #    copied in as bytes
     if output_file:
         if not os.path.isabs(output_file):
             output_file = os.path.join(os.getcwd(), output_file)
-        full = "\n".join(output_lines) + "\n\nCONTENT OF SELECTED FILES:\n" + content
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write(full)
+        # Write to a temp file next to the real target (so symlinked output
+        # files are written through) and swap it in, so an interrupted run
+        # never leaves a truncated output file behind
+        target = os.path.realpath(output_file)
+        fd, tmp_file = tempfile.mkstemp(
+            dir=os.path.dirname(target),
+            prefix=os.path.basename(target) + ".",
+            suffix=".tmp",
+        )
+        try:
+            with os.fdopen(fd, "wb") as out:
+                reads = _read_files(selected_files)
+                try:
+                    out.write(_native_newlines(
+                        (buf.getvalue() + "\nCONTENT OF SELECTED FILES:\n").encode("utf-8")
+                    ))
+                    for i, (p, (data, error)) in enumerate(zip(selected_files, reads)):
+                        rel = rel_to_project(p)
+                        header = f"\n--- {rel} ---\n\n" if i == 0 else f"\n\n--- {rel} ---\n\n"
+                        out.write(_native_newlines(header.encode("utf-8")))
+                        if error is None:
+                            out.write(data)
+                        else:
+                            out.write(_native_newlines(f"Error reading {rel}: {error}".encode("utf-8")))
+                finally:
+                    reads.close()
+            os.chmod(tmp_file, _output_mode(target))
+            os.replace(tmp_file, target)
+        except BaseException:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            raise
         echo_and_capture(f"\nContents of selected files saved to: {output_file}")
+        flush_output()
 
 
 if __name__ == "__main__":
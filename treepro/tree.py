@@ -3,7 +3,6 @@ import json
 import pathspec
 from rich.tree import Tree
 from rich.console import Console
-import yaml
 
 def load_gitignore(base_dir):
     gitignore_path = os.path.join(base_dir, ".gitignore")
@@ -13,40 +12,70 @@ def load_gitignore(base_dir):
         return spec
     return None
 
-def collect_items(directory, base_dir, spec, depth=0, counter=None):
+def _is_ignored(spec, rel_path, is_dir):
+    if not spec:
+        return False
+    if spec.match_file(rel_path):
+        return True
+    # Directory-only patterns (e.g. "build/") need the trailing slash
+    return is_dir and spec.match_file(rel_path + "/")
+
+def _entry_is_dir(entry):
+    # Like os.path.isdir: broken, looping or unreadable symlinks count as files
+    try:
+        return entry.is_dir()
+    except OSError:
+        return False
+
+def _scan_dir(directory):
+    # (name, is_dir) pairs; scandir usually knows the entry type without a stat
+    with os.scandir(directory) as it:
+        return sorted((e.name, _entry_is_dir(e)) for e in it)
+
+def _list_dir(directory, listings=None):
+    # `listings` is a dict shared by the walks of one run (the structure view
+    # and get_all_items cover the same tree), so each directory is read once
+    if listings is None:
+        return _scan_dir(directory)
+    entries = listings.get(directory)
+    if entries is None:
+        entries = listings[directory] = _scan_dir(directory)
+    return entries
+
+def collect_items(directory, base_dir, spec, depth=0, counter=None, listings=None):
     if counter is None:
         counter = [1]
     items = {}
     try:
-        entries = sorted(os.listdir(directory))
+        entries = _list_dir(directory, listings)
     except PermissionError:
         return items
 
-    for entry in entries:
+    for entry, is_dir in entries:
         # Skip files and directories starting with a dot
         if entry.startswith("."):
             continue
         
         full_path = os.path.join(directory, entry)
         rel_path = os.path.relpath(full_path, base_dir)
-        check_path = rel_path + "/" if os.path.isdir(full_path) else rel_path
-        if spec and (spec.match_file(rel_path) or spec.match_file(check_path)):
+        if _is_ignored(spec, rel_path, is_dir):
             continue
 
         num = counter[0]
         counter[0] += 1
-        items[num] = {"path": full_path, "is_dir": os.path.isdir(full_path), "depth": depth}
+        items[num] = {"path": full_path, "is_dir": is_dir, "depth": depth}
 
-        if os.path.isdir(full_path):
-            child_items = collect_items(full_path, base_dir, spec, depth=depth+1, counter=counter)
+        if is_dir:
+            child_items = collect_items(full_path, base_dir, spec, depth=depth+1, counter=counter,
+                                        listings=listings)
             items.update(child_items)
 
     return items
 
 
-def get_all_items(directory="."):
+def get_all_items(directory=".", listings=None):
     spec = load_gitignore(directory)
-    return collect_items(directory, directory, spec)
+    return collect_items(directory, directory, spec, listings=listings)
 
 def gather_selected_files(items, selected_numbers):
     selected_files = set()
@@ -63,28 +92,27 @@ def gather_selected_files(items, selected_numbers):
             selected_files.add(item["path"])
     return selected_files
 
-def get_project_structure_tree(directory):
+def get_project_structure_tree(directory, listings=None):
     spec = load_gitignore(directory)
     root = Tree(os.path.basename(os.path.abspath(directory)))  # Root directory name
 
     def add_nodes(parent_node, current_dir):
         try:
-            entries = sorted(os.listdir(current_dir))
+            entries = _list_dir(current_dir, listings)
         except PermissionError:
             return
         
-        for entry in entries:
+        for entry, is_dir in entries:
             # Exclude hidden/system files and directories
             if entry.startswith(".") or entry in {"dist", "build", "__pycache__"}:
                 continue
 
             full_path = os.path.join(current_dir, entry)
             rel_path = os.path.relpath(full_path, directory)
-            check_path = rel_path + "/" if os.path.isdir(full_path) else rel_path
-            if spec and (spec.match_file(rel_path) or spec.match_file(check_path)):
+            if _is_ignored(spec, rel_path, is_dir):
                 continue
 
-            if os.path.isdir(full_path):
+            if is_dir:
                 branch = parent_node.add(f"{entry}/")
                 add_nodes(branch, full_path)
             else:
@@ -95,49 +123,63 @@ def get_project_structure_tree(directory):
 
 
 
-def get_full_project_tree_text(directory):
-    root = get_project_structure_tree(directory)
+def get_full_project_tree_text(directory, listings=None):
+    root = get_project_structure_tree(directory, listings)
     console = Console(record=True)
     with console.capture() as capture:
         console.print(root)
     tree_text = capture.get()
     return tree_text
 
-def get_project_tree_dict(directory, base_dir=None):
+def get_project_tree_dict(directory, base_dir=None, listings=None):
     if base_dir is None:
         base_dir = directory
-    spec = load_gitignore(base_dir)
-    tree = {
-        "name": os.path.basename(os.path.abspath(directory)),  # Show the actual directory name
-        "type": "directory",
-        "children": []
-    }
-    try:
-        entries = sorted(os.listdir(directory))
-    except PermissionError:
+    spec = load_gitignore(base_dir)  # Parsed once for the whole walk
+
+    def build(current_dir):
+        tree = {
+            "name": os.path.basename(os.path.abspath(current_dir)),  # Show the actual directory name
+            "type": "directory",
+            "children": []
+        }
+        try:
+            entries = _list_dir(current_dir, listings)
+        except PermissionError:
+            return tree
+
+        for entry, is_dir in entries:
+            full_path = os.path.join(current_dir, entry)
+            rel_path = os.path.relpath(full_path, base_dir)
+            if _is_ignored(spec, rel_path, is_dir):
+                continue
+            if is_dir:
+                tree["children"].append(build(full_path))
+            else:
+                tree["children"].append({
+                    "name": entry,
+                    "type": "file"
+                })
         return tree
 
-    for entry in entries:
-        full_path = os.path.join(directory, entry)
-        rel_path = os.path.relpath(full_path, base_dir)
-        check_path = rel_path + "/" if os.path.isdir(full_path) else rel_path
-        if spec and (spec.match_file(rel_path) or spec.match_file(check_path)):
-            continue
-        if os.path.isdir(full_path):
-            tree["children"].append(get_project_tree_dict(full_path, base_dir))
-        else:
-            tree["children"].append({
-                "name": entry,
-                "type": "file"
-            })
-    return tree
-
-def get_full_project_tree_json(directory):
-    tree_dict = get_project_tree_dict(directory)
+    return build(directory)
+
+def get_full_project_tree_json(directory, listings=None):
+    tree_dict = get_project_tree_dict(directory, listings=listings)
     return json.dumps(tree_dict, indent=2)
 
-def get_full_project_tree_yaml(directory):
-    tree_dict = get_project_tree_dict(directory)
-    return yaml.dump(tree_dict, default_flow_style=False, sort_keys=False)
+def get_full_project_tree_yaml(directory, listings=None):
+    # Imported lazily: only the YAML output format needs it
+    import yaml
+    try:
+        from yaml import CSafeDumper as Dumper
+    except ImportError:  # libyaml not available
+        from yaml import SafeDumper as Dumper
+
+    tree_dict = get_project_tree_dict(directory, listings=listings)
+    try:
+        return yaml.dump(tree_dict, Dumper=Dumper, default_flow_style=False, sort_keys=False)
+    except UnicodeEncodeError:
+        # libyaml can't emit names that aren't valid UTF-8 (surrogate escapes)
+        return yaml.dump(tree_dict, Dumper=yaml.SafeDumper, default_flow_style=False, sort_keys=False)
 
 """ PROVA PULL REQUEST! """
\ No newline at end of file